@@ -4,10 +4,53 @@ import plotly.express as px
 import plotly.graph_objects as go
 from database import ElectricShopDB
 from datetime import datetime
+from streamlit_autorefresh import st_autorefresh
 
 # Initialize database
 db = ElectricShopDB()
 
+PRODUCT_COLUMNS = ['Product Code', 'Product Name', 'Category', 'Price', 'Stock', 'Last Updated']
+SALES_COLUMNS = ['ID', 'Product Code', 'Quantity', 'Total Price', 'Sale Date', 'Product Name', 'Category']
+SALES_HISTORY_LIMIT = 50
+
+def refresh_cache():
+    # Merge only the rows touched since the last poll into the session's cached frames
+    last_change_id = st.session_state.get('last_change_id')
+    update = db.get_cache_update(last_change_id, SALES_HISTORY_LIMIT)
+    if not update['full'] and update['last_change_id'] == last_change_id:
+        return
+    st.session_state.last_change_id = update['last_change_id']
+    # The sales summary aggregates the whole sales table, so only recompute it after a change
+    st.session_state.pop('summary_df', None)
+    
+    if update['full']:
+        st.session_state.products_df = pd.DataFrame(update['products'], columns=PRODUCT_COLUMNS)
+    elif update['products'] or update['deleted_codes']:
+        fresh = pd.DataFrame(update['products'], columns=PRODUCT_COLUMNS).set_index('Product Code')
+        products_df = st.session_state.products_df.set_index('Product Code')
+        products_df = products_df.drop(index=list(update['deleted_codes']), errors='ignore')
+        existing = products_df.index.intersection(fresh.index)
+        products_df.loc[existing] = fresh.loc[existing]
+        added = fresh.drop(index=existing)
+        # Concatenating onto an empty (object dtype) frame would leave Price/Stock as object
+        if products_df.empty:
+            products_df = added
+        elif not added.empty:
+            products_df = pd.concat([products_df, added])
+        st.session_state.products_df = products_df.reset_index()
+    
+    if update['full_sales']:
+        st.session_state.sales_df = pd.DataFrame(update['sales'], columns=SALES_COLUMNS)
+    elif update['sales']:
+        new_sales = pd.DataFrame(update['sales'], columns=SALES_COLUMNS)
+        # Same empty-frame guard as the products merge above
+        if st.session_state.sales_df.empty:
+            sales_df = new_sales
+        else:
+            sales_df = pd.concat([new_sales, st.session_state.sales_df], ignore_index=True)
+        sales_df = sales_df.drop_duplicates('ID').sort_values('Sale Date', ascending=False, kind='stable')
+        st.session_state.sales_df = sales_df.head(SALES_HISTORY_LIMIT).reset_index(drop=True)
+
 # Page config
 st.set_page_config(
     page_title="Electric Shop Dashboard",
@@ -170,6 +213,9 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+# Bring the session's cached frames up to date before rendering
+refresh_cache()
+
 # Sidebar with enhanced styling
 with st.sidebar:
     st.title("⚡ Electric Shop")
@@ -177,9 +223,8 @@ with st.sidebar:
     page = st.radio("Navigation", ["Dashboard", "Add Product", "Manage Stock", "Inventory"])
     st.markdown("---")
     st.markdown("### Quick Stats")
-    products = db.get_all_products()
-    if products:
-        df = pd.DataFrame(products, columns=['Product Code', 'Product Name', 'Category', 'Price', 'Stock', 'Last Updated'])
+    df = st.session_state.products_df
+    if not df.empty:
         st.metric("Total Products", len(df))
         st.metric("Total Value", f"${df['Price'].mul(df['Stock']).sum():,.2f}")
     
@@ -191,14 +236,21 @@ with st.sidebar:
             st.experimental_rerun()
         else:
             st.error("Failed to load sample data.")
+    
+    st.markdown("---")
+    st.markdown("### Live Updates")
+    auto_refresh = st.checkbox("Auto Refresh", value=False)
+    refresh_interval = st.slider("Refresh every (seconds)", min_value=2, max_value=30, value=5, disabled=not auto_refresh)
+    if auto_refresh:
+        # Timer runs in the browser, so the script never blocks waiting for the next refresh
+        st_autorefresh(interval=refresh_interval * 1000, key="auto_refresh")
 
 # Dashboard Page
 if page == "Dashboard":
     st.title("📊 Electric Shop Analytics")
     
-    products = db.get_all_products() # Fetch products again for this page
-    if products:
-        df = pd.DataFrame(products, columns=['Product Code', 'Product Name', 'Category', 'Price', 'Stock', 'Last Updated'])
+    df = st.session_state.products_df
+    if not df.empty:
         
         # Add date range filter
         col1, col2 = st.columns(2)
@@ -363,9 +415,8 @@ elif page == "Add Product":
 elif page == "Manage Stock":
     st.title("📦 Stock Management")
     
-    products = db.get_all_products()
-    if products:
-        df = pd.DataFrame(products, columns=['Product Code', 'Product Name', 'Category', 'Price', 'Stock', 'Last Updated'])
+    df = st.session_state.products_df
+    if not df.empty:
         
         # Create tabs for different sections
         tab1, tab2 = st.tabs(["Update Stock", "Sales History"])
@@ -408,6 +459,7 @@ elif page == "Manage Stock":
                                     if remove_stock > 0:
                                         total_price = remove_stock * product_info['Price']
                                         db.record_sale(selected_product_code, remove_stock, total_price)
+                                    refresh_cache()  # Pick up the stock update for the tables below
                                     st.success(f"Stock for '{selected_product_code}' updated successfully!")
                                 else:
                                     st.error(f"Failed to update stock for '{selected_product_code}'! Not enough stock available.")
@@ -420,9 +472,8 @@ elif page == "Manage Stock":
             
             with col2:
                 st.subheader("Current Stock Levels")
-                updated_products = db.get_all_products()
-                if updated_products:
-                    updated_df = pd.DataFrame(updated_products, columns=['Product Code', 'Product Name', 'Category', 'Price', 'Stock', 'Last Updated'])
+                updated_df = st.session_state.products_df
+                if not updated_df.empty:
                     st.dataframe(updated_df[['Product Code', 'Product Name', 'Category', 'Stock', 'Last Updated']],
                                 use_container_width=True)
                 else:
@@ -432,11 +483,8 @@ elif page == "Manage Stock":
             st.subheader("📊 Sales History")
             
             # Get sales history
-            sales_history = db.get_sales_history()
-            if sales_history:
-                sales_df = pd.DataFrame(sales_history, 
-                    columns=['ID', 'Product Code', 'Quantity', 'Total Price', 'Sale Date', 'Product Name', 'Category'])
-                
+            sales_df = st.session_state.sales_df
+            if not sales_df.empty:
                 # Display sales summary metrics
                 col1, col2, col3 = st.columns(3)
                 with col1:
@@ -453,10 +501,11 @@ elif page == "Manage Stock":
                 
                 # Display sales summary by product
                 st.markdown("### Sales Summary by Product")
-                sales_summary = db.get_sales_summary()
-                if sales_summary:
-                    summary_df = pd.DataFrame(sales_summary,
+                if 'summary_df' not in st.session_state:
+                    st.session_state.summary_df = pd.DataFrame(db.get_sales_summary(),
                         columns=['Product Code', 'Product Name', 'Category', 'Total Sales', 'Total Quantity', 'Total Revenue'])
+                summary_df = st.session_state.summary_df
+                if not summary_df.empty:
                     st.dataframe(summary_df, use_container_width=True)
             else:
                 st.info("No sales history available yet.")
@@ -467,9 +516,8 @@ elif page == "Manage Stock":
 elif page == "Inventory":
     st.title("📋 Inventory Management")
     
-    products = db.get_all_products() # Fetch products again for this page
-    if products:
-        df = pd.DataFrame(products, columns=['Product Code', 'Product Name', 'Category', 'Price', 'Stock', 'Last Updated'])
+    df = st.session_state.products_df
+    if not df.empty:
         
         # Search and filter
         col1, col2 = st.columns(2)
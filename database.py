@@ -1,9 +1,12 @@
 import sqlite3
 from datetime import datetime
 
+# Number of change_log rows kept; readers further behind than this do a full reload
+CHANGE_LOG_RETENTION = 10000
+
 class ElectricShopDB:
-    def __init__(self):
-        self.conn = sqlite3.connect('electric_shop.db')
+    def __init__(self, db_path='electric_shop.db', **connect_kwargs):
+        self.conn = sqlite3.connect(db_path, **connect_kwargs)
         self.create_tables()
     
     def create_tables(self):
@@ -29,6 +32,42 @@ class ElectricShopDB:
                 FOREIGN KEY (product_code) REFERENCES products(product_code)
             )
         ''')
+        
+        # Change feed: every write to products/sales_history appends a row here,
+        # so readers can poll for new ids instead of re-reading whole tables
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS change_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                table_name TEXT NOT NULL,
+                row_key TEXT NOT NULL,
+                operation TEXT NOT NULL,
+                changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        for operation, row in (('INSERT', 'NEW'), ('UPDATE', 'NEW'), ('DELETE', 'OLD')):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS products_{operation.lower()}_log
+                AFTER {operation} ON products
+                BEGIN
+                    INSERT INTO change_log (table_name, row_key, operation)
+                    VALUES ('products', {row}.product_code, '{operation.lower()}');
+                END
+            ''')
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS sales_history_{operation.lower()}_log
+                AFTER {operation} ON sales_history
+                BEGIN
+                    INSERT INTO change_log (table_name, row_key, operation)
+                    VALUES ('sales_history', {row}.id, '{operation.lower()}');
+                END
+            ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS change_log_retention
+            AFTER INSERT ON change_log
+            BEGIN
+                DELETE FROM change_log WHERE id <= NEW.id - {CHANGE_LOG_RETENTION};
+            END
+        ''')
         self.conn.commit()
     
     def add_product(self, product_code, product_name, category, price, stock_quantity):
@@ -122,6 +161,101 @@ class ElectricShopDB:
         ''')
         return cursor.fetchall()
     
+    def get_last_change_id(self):
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT COALESCE(MAX(id), 0) FROM change_log')
+        return cursor.fetchone()[0]
+    
+    def get_changes_since(self, change_id):
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT id, table_name, row_key, operation
+            FROM change_log
+            WHERE id > ?
+            ORDER BY id
+        ''', (change_id,))
+        return cursor.fetchall()
+    
+    def get_change_summary(self, change_id):
+        # Collapse the log since change_id into what a cached reader has to refetch
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT MIN(id), COALESCE(MAX(id), 0) FROM change_log')
+        oldest_id, newest_id = cursor.fetchone()
+        summary = {
+            'last_change_id': change_id,
+            # The log was pruned past change_id, or the database was replaced under the reader
+            'reload_all': change_id > newest_id or (oldest_id is not None and change_id < oldest_id - 1),
+            'changed_codes': set(),
+            'new_sale_ids': [],
+            'reload_sales': False,
+        }
+        if summary['reload_all'] or change_id == newest_id:
+            return summary
+        
+        for row_id, table_name, row_key, operation in self.get_changes_since(change_id):
+            summary['last_change_id'] = row_id
+            if table_name == 'products':
+                summary['changed_codes'].add(row_key)
+                # Deleted products drop out of the sales join, and re-added codes bring their old sales back
+                if operation in ('insert', 'delete'):
+                    summary['reload_sales'] = True
+            elif operation == 'insert':
+                summary['new_sale_ids'].append(int(row_key))
+            else:
+                # Edited or deleted sales may move anywhere in the list
+                summary['reload_sales'] = True
+        return summary
+    
+    def get_products_by_codes(self, product_codes):
+        if not product_codes:
+            return []
+        cursor = self.conn.cursor()
+        placeholders = ', '.join('?' for _ in product_codes)
+        cursor.execute(f'SELECT * FROM products WHERE product_code IN ({placeholders})', tuple(product_codes))
+        return cursor.fetchall()
+    
+    def get_sales_since(self, sale_id):
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT s.*, p.product_name, p.category
+            FROM sales_history s
+            JOIN products p ON s.product_code = p.product_code
+            WHERE s.id > ?
+            ORDER BY s.id
+        ''', (sale_id,))
+        return cursor.fetchall()
+    
+    def get_cache_update(self, change_id=None, sales_limit=50):
+        # Rows a cached reader at change_id needs to catch up. No id, or one the log can
+        # no longer serve, gets a full snapshot instead of a delta
+        summary = self.get_change_summary(change_id) if change_id is not None else None
+        if summary is None or summary['reload_all']:
+            # Take the change id first so writes landing during the full load are replayed next time
+            last_change_id = self.get_last_change_id()
+            return {
+                'last_change_id': last_change_id,
+                'full': True,
+                'products': self.get_all_products(),
+                'deleted_codes': set(),
+                'sales': self.get_sales_history(sales_limit),
+                'full_sales': True,
+            }
+        
+        products = self.get_products_by_codes(list(summary['changed_codes']))
+        update = {
+            'last_change_id': summary['last_change_id'],
+            'full': False,
+            'products': products,
+            'deleted_codes': summary['changed_codes'] - {row[0] for row in products},
+            'sales': [],
+            'full_sales': summary['reload_sales'],
+        }
+        if summary['reload_sales']:
+            update['sales'] = self.get_sales_history(sales_limit)
+        elif summary['new_sale_ids']:
+            update['sales'] = self.get_sales_since(min(summary['new_sale_ids']) - 1)
+        return update
+    
     def add_sample_data(self):
         # Sample products
         sample_products = [
@@ -0,0 +1,277 @@
+"""Concurrent load harness for the dashboard read paths and the till write paths.
+
+Simulates N Streamlit sessions rerunning app.py pages alongside M writer threads
+calling update_stock / record_sale / add_product, then reports throughput,
+p50/p99 latency, "database is locked" errors and commit waits.
+
+    python load_test.py --db electric_shop.db --sessions 20 --writers 4 --duration 30
+
+By default the run works on a temporary copy of the database; pass --in-place
+to hammer the file itself.
+"""
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+from database import ElectricShopDB
+
+PAGES = ["Dashboard", "Add Product", "Manage Stock", "Inventory"]
+SALES_HISTORY_LIMIT = 50
+WRITE_STATEMENTS = ("INSERT", "UPDATE", "DELETE")
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.locked = defaultdict(int)
+        self.commit_waits = []
+        self.write_waits = []
+
+    def record(self, op, elapsed, failed=False):
+        # Failed operations usually return fast, so keep them out of the latency percentiles
+        with self.lock:
+            if not failed:
+                self.latencies[op].append(elapsed)
+            else:
+                self.errors[op] += 1
+
+    def record_locked(self, where):
+        with self.lock:
+            self.locked[where] += 1
+
+    def record_commit(self, elapsed):
+        with self.lock:
+            self.commit_waits.append(elapsed)
+
+    def record_write(self, elapsed):
+        with self.lock:
+            self.write_waits.append(elapsed)
+
+
+stats = Stats()
+
+
+def is_locked_error(error):
+    return isinstance(error, sqlite3.OperationalError) and 'database is locked' in str(error)
+
+
+class TimedCursor(sqlite3.Cursor):
+    # ElectricShopDB swallows some errors (record_sale), so count lock errors where they happen
+    def execute(self, sql, parameters=()):
+        # Write statements are where the busy timeout waits for the write lock
+        is_write = sql.lstrip().split(None, 1)[0].upper() in WRITE_STATEMENTS
+        start = time.perf_counter()
+        try:
+            result = super().execute(sql, parameters)
+        except sqlite3.OperationalError as e:
+            if is_locked_error(e):
+                stats.record_locked('execute')
+            raise
+        if is_write:
+            stats.record_write(time.perf_counter() - start)
+        return result
+
+
+class TimedConnection(sqlite3.Connection):
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def commit(self):
+        # Commits with no open transaction (e.g. create_tables on every rerun) are no-ops
+        if not self.in_transaction:
+            return super().commit()
+        start = time.perf_counter()
+        try:
+            super().commit()
+        except sqlite3.OperationalError as e:
+            if is_locked_error(e):
+                stats.record_locked('commit')
+            raise
+        finally:
+            stats.record_commit(time.perf_counter() - start)
+
+
+def open_db(db_path, timeout):
+    return ElectricShopDB(db_path, factory=TimedConnection, timeout=timeout)
+
+
+def run_page(db, page, cache, full_reload):
+    # One rerun of `page`: app.py's refresh_cache, then the page's own cached queries
+    if full_reload:
+        cache.clear()
+    last_change_id = cache.get('last_change_id')
+    update = db.get_cache_update(last_change_id, SALES_HISTORY_LIMIT)
+    if update['full'] or update['last_change_id'] != last_change_id:
+        cache['last_change_id'] = update['last_change_id']
+        cache.pop('sales_summary', None)
+
+    if page == "Manage Stock" and 'sales_summary' not in cache:
+        cache['sales_summary'] = db.get_sales_summary()
+
+
+def session_worker(db_path, args, stop, seed):
+    rng = random.Random(seed)
+    cache = {}
+    while not stop.is_set():
+        page = rng.choice(PAGES)
+        start = time.perf_counter()
+        failed = False
+        db = None
+        try:
+            # Streamlit re-executes app.py top to bottom, so every rerun opens a fresh connection
+            db = open_db(db_path, args.timeout)
+            run_page(db, page, cache, args.full_reload)
+        except sqlite3.Error:
+            # Holding on to the exception would keep its traceback, and a half-built
+            # ElectricShopDB, alive until the cyclic GC frees it from another thread
+            failed = True
+        finally:
+            if db is not None:
+                db.conn.close()
+        stats.record(f"page:{page}", time.perf_counter() - start, failed)
+        stop.wait(args.session_interval)
+
+
+def writer_worker(db_path, args, stop, seed, product_codes):
+    rng = random.Random(seed)
+    db = None
+    added = 0
+    while not stop.is_set():
+        op = rng.choices(["update_stock", "record_sale", "add_product"], weights=[4, 4, 1])[0]
+        product_code = rng.choice(product_codes)
+        start = time.perf_counter()
+        failed = False
+        try:
+            # A till keeps its connection open, but opening it can itself hit the lock
+            if db is None:
+                db = open_db(db_path, args.timeout)
+            if op == "update_stock":
+                ok = db.update_stock(product_code, rng.choice([-1, 1]) * rng.randint(1, 5))
+            elif op == "record_sale":
+                quantity = rng.randint(1, 5)
+                ok = db.record_sale(product_code, quantity, quantity * 9.99)
+            else:
+                added += 1
+                ok = db.add_product(f"LOAD-{seed}-{added}", f"Load Test Item {added}", "Other", 9.99, 100)
+            if not ok:
+                # record_sale swallows a failed commit, which would otherwise keep holding the write lock
+                db.conn.rollback()
+                # update_stock returns False on insufficient stock, which is expected under load
+                failed = op != "update_stock"
+        except sqlite3.Error:
+            failed = True
+            if db is not None:
+                db.conn.rollback()
+        stats.record(f"write:{op}", time.perf_counter() - start, failed)
+        stop.wait(args.writer_interval)
+    if db is not None:
+        db.conn.close()
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def format_waits(label, waits):
+    if not waits:
+        return f"{label}: none"
+    return (f"{label}: {len(waits)}, total {sum(waits):.2f}s, "
+            f"p50 {percentile(waits, 50) * 1000:.2f} ms, p99 {percentile(waits, 99) * 1000:.2f} ms, "
+            f"max {max(waits) * 1000:.2f} ms")
+
+
+def print_report(duration):
+    print("\nLatencies cover successful operations only; failures are counted under Errors.")
+    print(f"{'Operation':<24}{'OK':>8}{'OK/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'Errors':>8}")
+    total = 0
+    total_errors = 0
+    for op in sorted(set(stats.latencies) | set(stats.errors)):
+        values = stats.latencies[op]
+        total += len(values)
+        total_errors += stats.errors[op]
+        p50 = f"{percentile(values, 50) * 1000:.2f}" if values else "-"
+        p99 = f"{percentile(values, 99) * 1000:.2f}" if values else "-"
+        print(f"{op:<24}{len(values):>8}{len(values) / duration:>10.1f}{p50:>10}{p99:>10}{stats.errors[op]:>8}")
+    print(f"{'total':<24}{total:>8}{total / duration:>10.1f}{'':>20}{total_errors:>8}")
+
+    print(f"\n'database is locked' errors: {sum(stats.locked.values())} "
+          f"(execute: {stats.locked['execute']}, commit: {stats.locked['commit']})")
+    print(format_waits("Commit waits (transactions with writes)", stats.commit_waits))
+    print(format_waits("Write statements (includes busy-timeout waits for the write lock)", stats.write_waits))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent load test for the Electric Shop dashboard database.")
+    parser.add_argument("--db", default="electric_shop.db", help="SQLite database to test against")
+    parser.add_argument("--sessions", type=int, default=10, help="Concurrent dashboard sessions")
+    parser.add_argument("--writers", type=int, default=2, help="Concurrent till writer threads")
+    parser.add_argument("--duration", type=float, default=10.0, help="Test length in seconds")
+    parser.add_argument("--session-interval", type=float, default=0.5, help="Seconds between reruns per session")
+    parser.add_argument("--writer-interval", type=float, default=0.05, help="Seconds between writes per writer")
+    parser.add_argument("--timeout", type=float, default=5.0, help="sqlite3 busy timeout in seconds")
+    parser.add_argument("--full-reload", action="store_true", help="Start every rerun with an empty session cache, so whole tables are re-read")
+    parser.add_argument("--in-place", action="store_true", help="Write to --db directly instead of a temporary copy")
+    parser.add_argument("--sample-data", action="store_true", help="Load the sample products first if the database has none")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+    # ElectricShopDB would quietly create a new, empty database for a mistyped path
+    if not os.path.isfile(args.db):
+        parser.error(f"database not found: {args.db}")
+
+    temp_dir = None
+    db_path = args.db
+    if not args.in_place:
+        temp_dir = tempfile.mkdtemp(prefix="electric_shop_load_")
+        db_path = os.path.join(temp_dir, "electric_shop.db")
+        shutil.copy(args.db, db_path)
+
+    try:
+        setup_db = ElectricShopDB(db_path)
+        product_codes = [row[0] for row in setup_db.get_all_products()]
+        if not product_codes and args.sample_data:
+            setup_db.add_sample_data()
+            product_codes = [row[0] for row in setup_db.get_all_products()]
+        setup_db.conn.close()
+        if not product_codes:
+            parser.error(f"{args.db} has no products for the writers to use; pass --sample-data to load some")
+
+        print(f"Running {args.sessions} sessions and {args.writers} writers for {args.duration:.0f}s against {db_path}"
+              f" ({'full reload' if args.full_reload else 'change feed'})")
+        stop = threading.Event()
+        threads = [threading.Thread(target=session_worker, args=(db_path, args, stop, args.seed + i))
+                   for i in range(args.sessions)]
+        threads += [threading.Thread(target=writer_worker, args=(db_path, args, stop, args.seed + 1000 + i, product_codes))
+                    for i in range(args.writers)]
+
+        start = time.perf_counter()
+        started = []
+        try:
+            for thread in threads:
+                thread.start()
+                started.append(thread)
+            time.sleep(args.duration)
+        except KeyboardInterrupt:
+            print("Interrupted, stopping workers...")
+        finally:
+            # Workers must be gone before the temporary database is removed
+            stop.set()
+            for thread in started:
+                thread.join()
+        print_report(time.perf_counter() - start)
+    finally:
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()